@@ -5,7 +5,12 @@ from typing import List, Optional
 from datetime import datetime
 from ...core.database import get_db
 from ...models import PlateEvent, Camera
-from ...schemas import PlateEvent as PlateEventSchema, PlateEventCreate
+from ...schemas import (
+    PlateEvent as PlateEventSchema,
+    PlateEventCreate,
+    PlateEventIngestError,
+    PlateEventBatchIngestResponse,
+)
 
 router = APIRouter()
 
@@ -65,6 +70,38 @@ async def ingest_plate_event(event: PlateEventCreate, db: Session = Depends(get_
     return db_event
 
 
+@router.post("/ingest-batch", response_model=PlateEventBatchIngestResponse)
+async def ingest_plate_events_batch(
+    events: List[PlateEventCreate],
+    db: Session = Depends(get_db)
+):
+    """Ingest a batch of plate events from the edge worker in a single commit"""
+    # Resolve all referenced cameras with one query
+    camera_ids = {event.camera_id for event in events}
+    known_ids = {
+        camera_id
+        for (camera_id,) in db.query(Camera.id).filter(Camera.id.in_(camera_ids)).all()
+    } if camera_ids else set()
+
+    errors = []
+    db_events = []
+    for index, event in enumerate(events):
+        if event.camera_id not in known_ids:
+            errors.append(PlateEventIngestError(
+                index=index,
+                status_code=404,
+                detail="Camera not found"
+            ))
+            continue
+        db_events.append(PlateEvent(**event.model_dump()))
+
+    if db_events:
+        db.add_all(db_events)
+        db.commit()
+
+    return PlateEventBatchIngestResponse(ingested=len(db_events), errors=errors)
+
+
 @router.delete("/{event_id}")
 def delete_plate_event(event_id: int, db: Session = Depends(get_db)):
     """Delete a plate event"""
@@ -1,6 +1,13 @@
 from .camera import Camera, CameraCreate, CameraUpdate
 from .zone import Zone, ZoneCreate, ZoneUpdate
-from .plate_event import PlateEvent, PlateEventCreate, PlateEventWithCamera, BoundingBox
+from .plate_event import (
+    PlateEvent,
+    PlateEventCreate,
+    PlateEventWithCamera,
+    BoundingBox,
+    PlateEventIngestError,
+    PlateEventBatchIngestResponse,
+)
 from .model import Model, ModelCreate, ModelUpdate
 from .exporter import Exporter, ExporterCreate, ExporterUpdate
 
@@ -15,6 +22,8 @@ __all__ = [
     "PlateEventCreate",
     "PlateEventWithCamera",
     "BoundingBox",
+    "PlateEventIngestError",
+    "PlateEventBatchIngestResponse",
     "Model",
     "ModelCreate",
     "ModelUpdate",
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 class BoundingBox(BaseModel):
@@ -36,3 +36,14 @@ class PlateEvent(PlateEventBase):
 class PlateEventWithCamera(PlateEvent):
     camera_name: str
     camera_location: Optional[str] = None
+
+
+class PlateEventIngestError(BaseModel):
+    index: int
+    status_code: int
+    detail: str
+
+
+class PlateEventBatchIngestResponse(BaseModel):
+    ingested: int
+    errors: List[PlateEventIngestError] = []
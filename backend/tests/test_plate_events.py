@@ -0,0 +1,89 @@
+"""
+Plate Event Ingest Tests
+Tests for the batch ingest endpoint used by the edge worker.
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+
+from app.api.endpoints.plate_events import ingest_plate_events_batch
+from app.schemas import PlateEventCreate
+
+
+def make_db(known_camera_ids):
+    """Create a mock session whose camera lookup returns the given IDs."""
+    db = MagicMock(spec=Session)
+    db.query.return_value.filter.return_value.all.return_value = [
+        (camera_id,) for camera_id in known_camera_ids
+    ]
+    return db
+
+
+def make_event(camera_id, plate_text):
+    """Create a plate event as sent by the edge worker."""
+    return PlateEventCreate(
+        camera_id=camera_id,
+        plate_text=plate_text,
+        confidence=0.9,
+        timestamp=datetime.now(timezone.utc),
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_ingest_commits_accepted_events_once():
+    """Test accepted events are added and committed in a single commit."""
+    db = make_db([1, 2])
+    events = [make_event(1, "ABC123"), make_event(2, "XYZ789")]
+
+    response = await ingest_plate_events_batch(events, db=db)
+
+    db.query.assert_called_once()
+    db.add_all.assert_called_once()
+    db.commit.assert_called_once()
+    committed = db.add_all.call_args.args[0]
+    assert [event.plate_text for event in committed] == ["ABC123", "XYZ789"]
+    assert response.ingested == len(committed) == 2
+    assert response.errors == []
+
+
+@pytest.mark.asyncio
+async def test_batch_ingest_rejects_unknown_cameras_per_index():
+    """Test events for unknown cameras get a per-index 404."""
+    db = make_db([1])
+    events = [make_event(1, "ABC123"), make_event(99, "XYZ789"), make_event(1, "DEF456")]
+
+    response = await ingest_plate_events_batch(events, db=db)
+
+    assert [(e.index, e.status_code) for e in response.errors] == [(1, 404)]
+    db.commit.assert_called_once()
+    committed = db.add_all.call_args.args[0]
+    assert [event.plate_text for event in committed] == ["ABC123", "DEF456"]
+    assert response.ingested == len(committed) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_ingest_all_unknown_cameras_does_not_commit():
+    """Test nothing is committed when every event is rejected."""
+    db = make_db([])
+    events = [make_event(99, "ABC123")]
+
+    response = await ingest_plate_events_batch(events, db=db)
+
+    db.add_all.assert_not_called()
+    db.commit.assert_not_called()
+    assert response.ingested == 0
+    assert len(response.errors) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_ingest_empty_list():
+    """Test an empty batch is accepted without touching the database."""
+    db = make_db([])
+
+    response = await ingest_plate_events_batch([], db=db)
+
+    assert response.model_dump() == {"ingested": 0, "errors": []}
+    db.query.assert_not_called()
+    db.commit.assert_not_called()
@@ -38,6 +38,9 @@ class HardwareAccelerationConfig(BaseModel):
     device_id: Optional[str] = Field(None, description="Device identifier (e.g., /dev/apex_0)")
     use_cuda: bool = Field(False, description="Enable CUDA acceleration")
     cuda_device: int = Field(0, description="CUDA device ID")
+    use_tensorrt: bool = Field(False, description="Use TensorRT execution provider for ONNX models")
+    tensorrt_fp16: bool = Field(True, description="Allow FP16 kernels in TensorRT engines")
+    tensorrt_cache_dir: Optional[str] = Field(None, description="Directory for cached TensorRT engines")
     num_threads: int = Field(4, ge=1, description="Number of threads for CPU inference")
 
 
@@ -3,7 +3,7 @@ Object Detection
 Supports multiple detection models and frameworks for vehicle and license plate detection
 """
 
-from typing import List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 import numpy as np
@@ -314,9 +314,20 @@ class ONNXDetector(BaseDetector):
 
         try:
             # Set execution providers
-            providers = []
-            if self.hardware_config.use_cuda and self.hardware_config.type == "gpu":
-                providers.append('CUDAExecutionProvider')
+            hw = self.hardware_config
+            providers: List[Any] = []
+            if hw.use_cuda and hw.type == "gpu":
+                if hw.use_tensorrt:
+                    # FP16 TensorRT engine, cached so it is only built on first run
+                    trt_options: Dict[str, Any] = {
+                        'device_id': hw.cuda_device,
+                        'trt_fp16_enable': hw.tensorrt_fp16,
+                    }
+                    if hw.tensorrt_cache_dir:
+                        trt_options['trt_engine_cache_enable'] = True
+                        trt_options['trt_engine_cache_path'] = hw.tensorrt_cache_dir
+                    providers.append(('TensorrtExecutionProvider', trt_options))
+                providers.append(('CUDAExecutionProvider', {'device_id': hw.cuda_device}))
             providers.append('CPUExecutionProvider')
 
             # Create inference session
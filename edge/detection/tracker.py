@@ -5,14 +5,19 @@ Centroid-based tracking for vehicles and license plates with zone crossing detec
 
 from typing import Dict, Tuple, Optional, List, Set
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from scipy.spatial import distance as dist
+from datetime import datetime
+from collections import OrderedDict
+from time import monotonic
+from scipy.optimize import linear_sum_assignment
 import numpy as np
 from loguru import logger
 
 from edge.detection.detector import DetectionResult
 from edge.config import TrackingConfig
 
+# Number of centroid positions kept per tracked object
+HISTORY_SIZE = 100
+
 
 @dataclass
 class TrackedObject:
@@ -28,9 +33,11 @@ class TrackedObject:
         first_seen: Timestamp when first detected
         last_seen: Timestamp when last detected
         disappeared: Number of frames disappeared
-        history: List of centroid positions
         plate_text: Recognized plate text (if applicable)
         plate_confidence: Plate recognition confidence
+        history_buffer: Ring buffer of the last HISTORY_SIZE centroids
+        history_head: Next write position in history_buffer
+        history_count: Number of valid rows in history_buffer
     """
     object_id: int
     class_name: str
@@ -40,16 +47,42 @@ class TrackedObject:
     first_seen: datetime
     last_seen: datetime
     disappeared: int = 0
-    history: List[Tuple[float, float]] = field(default_factory=list)
     plate_text: Optional[str] = None
     plate_confidence: Optional[float] = None
+    history_buffer: np.ndarray = field(
+        default_factory=lambda: np.empty((HISTORY_SIZE, 2), dtype=np.float32),
+        repr=False,
+        compare=False,
+    )
+    history_head: int = 0
+    history_count: int = 0
+
+    def append_history(self, centroid: Tuple[float, float]):
+        """
+        Append centroid to history, overwriting the oldest entry when full
+
+        Args:
+            centroid: Centroid position (x, y)
+        """
+        self.history_buffer[self.history_head] = centroid
+        self.history_head = (self.history_head + 1) % HISTORY_SIZE
+        if self.history_count < HISTORY_SIZE:
+            self.history_count += 1
+
+    @property
+    def history(self) -> np.ndarray:
+        """Copy of centroid positions as an (N, 2) array, oldest first"""
+        if self.history_count < HISTORY_SIZE:
+            return self.history_buffer[:self.history_count].copy()
+        return np.roll(self.history_buffer, -self.history_head, axis=0)
 
 
 class CentroidTracker:
     """
     Centroid-based object tracker
 
-    Tracks objects across frames using centroid distance matching.
+    Tracks objects across frames by optimally assigning detections to objects
+    on centroid distance (Hungarian algorithm).
     Handles object disappearance, zone crossing, and cooldown management.
     """
 
@@ -63,7 +96,8 @@ class CentroidTracker:
         self.config = config
         self.next_object_id = 0
         self.objects: Dict[int, TrackedObject] = {}
-        self.cooldown: Dict[str, datetime] = {}  # plate_text -> last_detection_time
+        # plate_text -> monotonic expiry time, kept in expiry order
+        self.cooldown: "OrderedDict[str, float]" = OrderedDict()
 
         logger.info(
             f"Centroid tracker initialized (max_disappeared={config.max_disappeared}, "
@@ -91,8 +125,8 @@ class CentroidTracker:
             confidence=detection.confidence,
             first_seen=timestamp,
             last_seen=timestamp,
-            history=[centroid],
         )
+        obj.append_history(centroid)
 
         self.objects[self.next_object_id] = obj
         self.next_object_id += 1
@@ -142,7 +176,8 @@ class CentroidTracker:
             return self.objects
 
         # Compute centroids for new detections
-        input_centroids = np.array([self._compute_centroid(d.bbox) for d in detections])
+        boxes = np.array([d.bbox for d in detections], dtype=np.float32)
+        input_centroids = (boxes[:, :2] + boxes[:, 2:]) * 0.5
 
         # If no tracked objects, register all detections
         if len(self.objects) == 0:
@@ -152,31 +187,36 @@ class CentroidTracker:
 
         # Get existing object IDs and centroids
         object_ids = list(self.objects.keys())
-        object_centroids = np.array([self.objects[oid].centroid for oid in object_ids])
+        object_centroids = np.array(
+            [self.objects[oid].centroid for oid in object_ids], dtype=np.float32
+        )
 
         # Compute distance matrix
-        D = dist.cdist(object_centroids, input_centroids)
+        D = np.linalg.norm(
+            object_centroids[:, None, :] - input_centroids[None, :, :], axis=2
+        )
 
-        # Match detections to existing objects
-        rows = D.min(axis=1).argsort()
-        cols = D.argmin(axis=1)[rows]
+        # Optimal assignment of detections to existing objects; pairs beyond
+        # max_distance are made prohibitively expensive and rejected below
+        max_distance = self.config.max_distance
+        cost = np.where(D > max_distance, max_distance * 1e3 + 1.0, D)
+        rows, cols = linear_sum_assignment(cost)
 
         used_rows = set()
         used_cols = set()
 
         for row, col in zip(rows, cols):
-            if row in used_rows or col in used_cols:
-                continue
-
             # Check if distance is within threshold
-            if D[row, col] > self.config.max_distance:
+            if D[row, col] > max_distance:
                 continue
 
             # Update object
             object_id = object_ids[row]
             detection = detections[col]
 
-            self._update_object(object_id, detection, timestamp)
+            self._update_object(
+                object_id, detection, timestamp, tuple(input_centroids[col].tolist())
+            )
 
             used_rows.add(row)
             used_cols.add(col)
@@ -198,7 +238,13 @@ class CentroidTracker:
 
         return self.objects
 
-    def _update_object(self, object_id: int, detection: DetectionResult, timestamp: datetime):
+    def _update_object(
+        self,
+        object_id: int,
+        detection: DetectionResult,
+        timestamp: datetime,
+        centroid: Tuple[float, float],
+    ):
         """
         Update existing tracked object
 
@@ -206,20 +252,16 @@ class CentroidTracker:
             object_id: Object ID
             detection: New detection result
             timestamp: Current timestamp
+            centroid: Precomputed centroid of the detection
         """
         obj = self.objects[object_id]
-        centroid = self._compute_centroid(detection.bbox)
 
         obj.centroid = centroid
         obj.bbox = detection.bbox
         obj.confidence = detection.confidence
         obj.last_seen = timestamp
         obj.disappeared = 0
-        obj.history.append(centroid)
-
-        # Limit history size
-        if len(obj.history) > 100:
-            obj.history = obj.history[-100:]
+        obj.append_history(centroid)
 
     def _compute_centroid(self, bbox: Tuple[int, int, int, int]) -> Tuple[float, float]:
         """
@@ -254,19 +296,16 @@ class CentroidTracker:
         """
         Check if plate is in cooldown period
 
+        Expired entries count as active until the next cleanup_cooldown()
+        call, which keeps this check to a single membership test.
+
         Args:
             plate_text: Plate text to check
 
         Returns:
             True if in cooldown, False otherwise
         """
-        if plate_text not in self.cooldown:
-            return False
-
-        last_detection = self.cooldown[plate_text]
-        cooldown_delta = timedelta(seconds=self.config.cooldown_seconds)
-
-        return datetime.utcnow() - last_detection < cooldown_delta
+        return plate_text in self.cooldown
 
     def add_to_cooldown(self, plate_text: str):
         """
@@ -275,27 +314,28 @@ class CentroidTracker:
         Args:
             plate_text: Plate text
         """
-        self.cooldown[plate_text] = datetime.utcnow()
+        # Fixed TTL, so moving refreshed entries to the end keeps expiry order
+        self.cooldown[plate_text] = monotonic() + self.config.cooldown_seconds
+        self.cooldown.move_to_end(plate_text)
         logger.debug(f"Added plate to cooldown: {plate_text}")
 
     def cleanup_cooldown(self):
         """
         Remove expired cooldown entries
         """
-        now = datetime.utcnow()
-        cooldown_delta = timedelta(seconds=self.config.cooldown_seconds)
-
-        expired = [
-            plate_text
-            for plate_text, last_time in self.cooldown.items()
-            if now - last_time > cooldown_delta
-        ]
+        now = monotonic()
+        expired = 0
 
-        for plate_text in expired:
-            del self.cooldown[plate_text]
+        # Entries are in expiry order; stop at the first one still active
+        while self.cooldown:
+            expires_at = next(iter(self.cooldown.values()))
+            if expires_at > now:
+                break
+            self.cooldown.popitem(last=False)
+            expired += 1
 
         if expired:
-            logger.debug(f"Cleaned up {len(expired)} expired cooldown entries")
+            logger.debug(f"Cleaned up {expired} expired cooldown entries")
 
     def get_active_objects(self) -> List[TrackedObject]:
         """
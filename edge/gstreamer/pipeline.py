@@ -5,8 +5,9 @@ and Hailo AI accelerator integration for license plate detection and OCR.
 
 import gi
 gi.require_version('Gst', '1.0')
-from gi.repository import Gst, GLib
+from gi.repository import Gst
 import logging
+import time
 from typing import Callable, Optional
 
 logger = logging.getLogger(__name__)
@@ -43,7 +44,9 @@ class ANPRPipeline:
             target_width: Target frame width for inference
             target_height: Target frame height for inference
             detection_threshold: Detection confidence threshold
-            result_callback: Callback function for results
+            result_callback: Callback function for results, called as
+                result_callback(camera_id, metadata, frame_ts) where frame_ts
+                is the frame capture time in epoch seconds
         """
         self.camera_id = camera_id
         self.rtsp_url = rtsp_url
@@ -58,7 +61,6 @@ class ANPRPipeline:
         Gst.init(None)
 
         self.pipeline = None
-        self.loop = None
         self.bus = None
 
     def build_pipeline(self) -> str:
@@ -105,6 +107,22 @@ class ANPRPipeline:
 
         return True
 
+    def _frame_timestamp(self, buf) -> float:
+        """
+        Get the wall-clock capture time of a buffer from its PTS.
+
+        The pipeline runs on a realtime clock, so base time plus PTS is
+        already epoch time and follows wall-clock corrections (e.g. NTP
+        setting the clock after boot on a device without an RTC).
+
+        Returns:
+            Frame timestamp in epoch seconds
+        """
+        if buf.pts == Gst.CLOCK_TIME_NONE:
+            return time.time()
+
+        return (self.pipeline.get_base_time() + buf.pts) / Gst.SECOND
+
     def on_result(self, element, buf):
         """
         Callback for plate detection results.
@@ -116,7 +134,7 @@ class ANPRPipeline:
             # This will be populated by the Hailo post-processing
             meta = buf.get_meta("HailoDetectionMeta")
             if meta:
-                self.result_callback(self.camera_id, meta)
+                self.result_callback(self.camera_id, meta, self._frame_timestamp(buf))
 
     def start(self):
         """Start the GStreamer pipeline"""
@@ -128,16 +146,16 @@ class ANPRPipeline:
 
             self.pipeline = Gst.parse_launch(pipeline_str)
 
+            # Wall-clock pipeline clock so buffer timestamps map to epoch time
+            self.pipeline.use_clock(
+                Gst.SystemClock(clock_type=Gst.ClockType.REALTIME)
+            )
+
             # Get result sink element and connect callback
             result_sink = self.pipeline.get_by_name("result_sink")
             if result_sink:
                 result_sink.connect("handoff", self.on_result)
 
-            # Setup bus
-            self.bus = self.pipeline.get_bus()
-            self.bus.add_signal_watch()
-            self.bus.connect("message", self.on_message)
-
             # Start pipeline
             ret = self.pipeline.set_state(Gst.State.PLAYING)
             if ret == Gst.StateChangeReturn.FAILURE:
@@ -146,9 +164,6 @@ class ANPRPipeline:
 
             logger.info(f"Camera {self.camera_id}: Pipeline started")
 
-            # Create main loop
-            self.loop = GLib.MainLoop()
-
             return True
 
         except Exception as e:
@@ -156,13 +171,17 @@ class ANPRPipeline:
             return False
 
     def run(self):
-        """Run the pipeline (blocking)"""
-        if self.loop:
-            try:
-                self.loop.run()
-            except KeyboardInterrupt:
-                logger.info(f"Camera {self.camera_id}: Interrupted by user")
-                self.stop()
+        """
+        Attach the pipeline bus to the default GLib main context and return.
+
+        Bus messages are dispatched by a GLib main loop that the caller runs
+        on the default context, so a single loop thread can serve any number
+        of pipelines.
+        """
+        if self.pipeline and not self.bus:
+            self.bus = self.pipeline.get_bus()
+            self.bus.add_signal_watch()
+            self.bus.connect("message", self.on_message)
 
     def stop(self):
         """Stop the pipeline"""
@@ -170,8 +189,9 @@ class ANPRPipeline:
             logger.info(f"Camera {self.camera_id}: Stopping pipeline")
             self.pipeline.set_state(Gst.State.NULL)
 
-        if self.loop:
-            self.loop.quit()
+        if self.bus:
+            self.bus.remove_signal_watch()
+            self.bus = None
 
     def get_stats(self) -> dict:
         """Get pipeline statistics"""
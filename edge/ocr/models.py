@@ -523,7 +523,12 @@ class FastPlateOCR(BaseOCR):
         target_height = 64
         target_width = 128
 
-        resized = cv2.resize(image, (target_width, target_height))
+        # Area interpolation when shrinking avoids aliasing on character strokes
+        h, w = image.shape[:2]
+        interpolation = (
+            cv2.INTER_AREA if w >= target_width and h >= target_height else cv2.INTER_LINEAR
+        )
+        resized = cv2.resize(image, (target_width, target_height), interpolation=interpolation)
 
         # Convert BGR to RGB
         if len(resized.shape) == 3 and resized.shape[2] == 3:
@@ -0,0 +1,356 @@
+"""
+Backend Client Tests
+Tests for edge worker backend communication using a mocked HTTP transport
+"""
+
+import json
+import pytest
+import httpx
+import numpy as np
+from datetime import datetime, timezone
+
+from edge.worker.backend_client import BackendClient, CircuitOpenError
+from edge.worker.models import PlateEvent
+
+
+class MockBackend:
+    """Mock backend replying with queued status codes (last one repeats)"""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return httpx.Response(status, json={})
+
+
+def create_backend_client(handler, **kwargs) -> BackendClient:
+    """
+    Create a backend client sending requests to a mock transport
+
+    Args:
+        handler: Mock transport request handler
+        **kwargs: Extra BackendClient arguments
+
+    Returns:
+        BackendClient instance
+    """
+    kwargs.setdefault("retry_wait_initial", 0.001)
+    kwargs.setdefault("retry_wait_max", 0.001)
+    client = BackendClient("http://backend", **kwargs)
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def create_test_event(camera_id=1, plate_text="ABC123"):
+    """
+    Create a test plate event
+
+    Args:
+        camera_id: Camera ID
+        plate_text: Plate text
+
+    Returns:
+        PlateEvent instance
+    """
+    return PlateEvent(
+        camera_id=camera_id,
+        plate_text=plate_text,
+        confidence=0.9,
+        timestamp=datetime.now(timezone.utc),
+    )
+
+
+class TestTransport:
+    """Test HTTP transport setup"""
+
+    def test_env_proxy_is_used_over_tcp(self, monkeypatch):
+        """Test HTTP_PROXY is honoured when no Unix socket is configured"""
+        monkeypatch.setenv("HTTP_PROXY", "http://proxy:3128")
+        client = BackendClient("http://backend")
+
+        transport = client.client._transport_for_url(client._url_health)
+        assert transport is not client.client._transport
+
+    def test_uds_routes_all_requests_through_socket(self, monkeypatch):
+        """Test a Unix socket transport handles every request"""
+        monkeypatch.setenv("HTTP_PROXY", "http://proxy:3128")
+        client = BackendClient("http://backend", uds="/run/anpr-upstream.sock")
+
+        transport = client.client._transport_for_url(client._url_health)
+        assert transport is client.client._transport
+
+
+class TestSerialization:
+    """Test plate event serialization"""
+
+    @pytest.mark.asyncio
+    async def test_numpy_confidence_is_serialized(self):
+        """Test numpy scalar confidences are sent as plain numbers"""
+        backend = MockBackend(200)
+        client = create_backend_client(backend)
+        event = create_test_event()
+        event.confidence = np.float64(0.5)
+        event.ocr_confidence = np.float32(0.25)
+
+        assert await client.ingest_plate_event(event)
+        body = json.loads(backend.requests[0].content)
+        assert body["confidence"] == 0.5
+        assert body["ocr_confidence"] == 0.25
+
+
+class TestRetryPolicy:
+    """Test retry behaviour of single event ingest"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [500, 503, 429])
+    async def test_retryable_status_is_retried(self, status):
+        """Test 5xx and 429 responses are retried until success"""
+        backend = MockBackend(status, status, 200)
+        client = create_backend_client(backend)
+
+        assert await client.ingest_plate_event(create_test_event(), max_retries=3)
+        assert len(backend.requests) == 3
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [400, 404, 422])
+    async def test_client_error_is_not_retried(self, status):
+        """Test other 4xx responses fail without retrying"""
+        backend = MockBackend(status)
+        client = create_backend_client(backend)
+
+        assert not await client.ingest_plate_event(create_test_event(), max_retries=3)
+        assert len(backend.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        """Test ingest fails after max_retries retryable failures"""
+        backend = MockBackend(500)
+        client = create_backend_client(backend, failure_threshold=10)
+
+        assert not await client.ingest_plate_event(create_test_event(), max_retries=3)
+        assert len(backend.requests) == 3
+
+
+class TestCircuitBreaker:
+    """Test backend circuit breaker"""
+
+    @pytest.mark.asyncio
+    async def test_opens_after_failure_threshold(self):
+        """Test breaker opens and short-circuits without sending requests"""
+        backend = MockBackend(500)
+        client = create_backend_client(backend, failure_threshold=2)
+
+        # Third attempt is short-circuited by the open breaker
+        assert not await client.ingest_plate_event(create_test_event(), max_retries=3)
+        assert len(backend.requests) == 2
+
+        with pytest.raises(CircuitOpenError):
+            await client._post(client._url_ingest, b"{}")
+        assert len(backend.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_count(self):
+        """Test non-retryable responses do not trip the breaker"""
+        backend = MockBackend(422)
+        client = create_backend_client(backend, failure_threshold=2)
+
+        for _ in range(3):
+            await client.ingest_plate_event(create_test_event())
+
+        assert client._cb_failures == 0
+        assert len(backend.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_resets_on_success(self):
+        """Test a successful request resets the failure count"""
+        backend = MockBackend(500, 200)
+        client = create_backend_client(backend, failure_threshold=3)
+
+        assert await client.ingest_plate_event(create_test_event(), max_retries=3)
+        assert client._cb_failures == 0
+
+    @pytest.mark.asyncio
+    async def test_half_open_failure_reopens(self):
+        """Test the first failure after the recovery window re-trips the breaker"""
+        backend = MockBackend(500)
+        client = create_backend_client(backend, failure_threshold=2)
+        await client.ingest_plate_event(create_test_event(), max_retries=2)
+
+        # Recovery window elapsed; a single failure opens the breaker again
+        client._cb_open_until = 0.0
+        with pytest.raises(httpx.HTTPStatusError):
+            await client._post(client._url_ingest, b"{}")
+        with pytest.raises(CircuitOpenError):
+            await client._post(client._url_ingest, b"{}")
+
+    @pytest.mark.asyncio
+    async def test_half_open_success_closes(self):
+        """Test a success after the recovery window closes the breaker"""
+        backend = MockBackend(500, 500, 200)
+        client = create_backend_client(backend, failure_threshold=2)
+        await client.ingest_plate_event(create_test_event(), max_retries=2)
+
+        client._cb_open_until = 0.0
+        assert await client.ingest_plate_event(create_test_event())
+        assert client._cb_failures == 0
+
+
+class MockBatchBackend:
+    """
+    Mock backend for batch ingest
+
+    Batch requests get the queued (status, body) replies in order (last one
+    repeats); single event requests get single_status.
+    """
+
+    def __init__(self, *batch_replies, single_status=200):
+        self.batch_replies = list(batch_replies)
+        self.single_status = single_status
+        self.batch_requests = []
+        self.single_requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/ingest-batch"):
+            self.batch_requests.append(json.loads(request.content))
+            if len(self.batch_replies) > 1:
+                status, body = self.batch_replies.pop(0)
+            else:
+                status, body = self.batch_replies[0]
+            return httpx.Response(status, json=body)
+
+        self.single_requests.append(json.loads(request.content))
+        return httpx.Response(self.single_status, json={})
+
+
+class TestBulkIngest:
+    """Test batch ingest and partial retry"""
+
+    @pytest.fixture
+    def events(self):
+        """Create a batch of test events"""
+        return [create_test_event(camera_id=i, plate_text=f"PLATE{i}") for i in range(3)]
+
+    @pytest.mark.asyncio
+    async def test_full_success(self, events):
+        """Test a fully accepted batch is sent in one request"""
+        backend = MockBatchBackend((200, {"ingested": 3, "errors": []}))
+        client = create_backend_client(backend)
+
+        assert await client.batch_ingest_events(events) == (3, [])
+        assert len(backend.batch_requests) == 1
+        assert [e["plate_text"] for e in backend.batch_requests[0]] == [
+            "PLATE0", "PLATE1", "PLATE2"
+        ]
+        assert not backend.single_requests
+
+    @pytest.mark.asyncio
+    async def test_unknown_camera_is_dropped(self, events):
+        """Test events rejected with a per-index 404 are not retried"""
+        backend = MockBatchBackend(
+            (200, {"ingested": 2, "errors": [
+                {"index": 1, "status_code": 404, "detail": "Camera not found"}
+            ]})
+        )
+        client = create_backend_client(backend)
+
+        assert await client.bulk_ingest(events) == (2, [])
+        assert len(backend.batch_requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_only_failed_events_are_resent(self, events):
+        """Test a per-index server error re-sends only that event"""
+        backend = MockBatchBackend(
+            (200, {"ingested": 2, "errors": [
+                {"index": 1, "status_code": 500, "detail": "Database error"}
+            ]}),
+            (200, {"ingested": 1, "errors": []}),
+        )
+        client = create_backend_client(backend)
+
+        assert await client.bulk_ingest(events) == (3, [])
+        assert len(backend.batch_requests) == 2
+        assert [e["plate_text"] for e in backend.batch_requests[1]] == ["PLATE1"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [404, 405, 422])
+    async def test_rejected_batch_falls_back_to_single_ingest(self, events, status):
+        """Test a batch rejected as a whole is sent event by event"""
+        backend = MockBatchBackend((status, {"detail": "rejected"}))
+        client = create_backend_client(backend)
+
+        assert await client.bulk_ingest(events) == (3, [])
+        assert len(backend.batch_requests) == 1
+        assert [e["plate_text"] for e in backend.single_requests] == [
+            "PLATE0", "PLATE1", "PLATE2"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_fallback_isolates_invalid_event(self, events):
+        """Test only the invalid event is lost when falling back"""
+        backend = MockBatchBackend((422, {"detail": "rejected"}))
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if not request.url.path.endswith("/ingest-batch"):
+                if json.loads(request.content)["plate_text"] == "PLATE1":
+                    return httpx.Response(422, json={})
+            return backend(request)
+
+        client = create_backend_client(handler)
+
+        assert await client.bulk_ingest(events) == (2, [])
+
+    @pytest.mark.asyncio
+    async def test_unserializable_batch_falls_back_to_single_ingest(self, events):
+        """Test a batch that cannot be serialized is sent event by event"""
+        backend = MockBatchBackend((200, {"ingested": 3, "errors": []}))
+        client = create_backend_client(backend)
+        events[1].metadata = {"raw": object()}
+
+        assert await client.bulk_ingest(events) == (2, [])
+        assert not backend.batch_requests
+        assert [e["plate_text"] for e in backend.single_requests] == [
+            "PLATE0", "PLATE2"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_defers_batch(self, events):
+        """Test a batch is returned unsent while the breaker is open"""
+        backend = MockBatchBackend((500, {}))
+        client = create_backend_client(backend, failure_threshold=2)
+
+        assert await client.bulk_ingest(events) == (0, events)
+        assert len(backend.batch_requests) == 2
+        assert client.circuit_open_for > 0
+
+        # Further batches are deferred without sending a request
+        assert await client.bulk_ingest(events) == (0, events)
+        assert len(backend.batch_requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_defers_only_unsent_events(self, events):
+        """Test events already ingested are not returned as deferred"""
+        backend = MockBatchBackend(
+            (200, {"ingested": 2, "errors": [
+                {"index": 2, "status_code": 500, "detail": "Database error"}
+            ]}),
+            (503, {}),
+        )
+        client = create_backend_client(backend, failure_threshold=1)
+
+        assert await client.bulk_ingest(events) == (2, [events[2]])
+
+    @pytest.mark.asyncio
+    async def test_breaker_opening_during_fallback_defers_rest(self, events):
+        """Test events left when the breaker opens mid-fallback are deferred"""
+        backend = MockBatchBackend((404, {}), single_status=503)
+        client = create_backend_client(backend, failure_threshold=2)
+
+        assert await client.bulk_ingest(events, max_retries=2) == (0, events)
+        assert len(backend.single_requests) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -3,13 +3,22 @@ Detection Tests
 Basic tests for vehicle and license plate detection
 """
 
+import sys
 import pytest
 import numpy as np
 import cv2
-from edge.detection.detector import DetectionResult, Detector
-from edge.detection.tracker import CentroidTracker, TrackedObject
+from unittest.mock import MagicMock
+from edge.detection.detector import DetectionResult, Detector, ONNXDetector
+from edge.detection.tracker import CentroidTracker, TrackedObject, HISTORY_SIZE
 from edge.config import DetectionModelConfig, HardwareAccelerationConfig, TrackingConfig
 from datetime import datetime
+from functools import lru_cache
+
+# Shared read-only frames; copy before mutating
+_ZERO_FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+_ZERO_FRAME.setflags(write=False)
+_SMALL_ZERO_FRAME = np.zeros((100, 100, 3), dtype=np.uint8)
+_SMALL_ZERO_FRAME.setflags(write=False)
 
 
 class TestDetectionResult:
@@ -142,6 +151,66 @@ class TestCentroidTracker:
         assert updated_obj.disappeared == 0
         assert len(updated_obj.history) == 2
 
+    def test_update_uses_optimal_assignment(self, tracker):
+        """Test update matches all objects where greedy matching would not"""
+        obj_a = tracker.register(
+            create_test_detection(bbox=(50, 100, 150, 200)), datetime.utcnow()
+        )
+        obj_b = tracker.register(
+            create_test_detection(bbox=(90, 100, 190, 200)), datetime.utcnow()
+        )
+
+        # Closest pair (obj_b, first detection) must not win the assignment
+        tracker.update(
+            [
+                create_test_detection(bbox=(75, 100, 175, 200)),
+                create_test_detection(bbox=(115, 100, 215, 200)),
+            ],
+            datetime.utcnow(),
+        )
+
+        assert len(tracker.objects) == 2
+        assert tracker.objects[obj_a.object_id].centroid == (125.0, 150.0)
+        assert tracker.objects[obj_b.object_id].centroid == (165.0, 150.0)
+
+    def test_history_ring_buffer(self, tracker):
+        """Test history keeps the most recent centroids in order"""
+        obj = tracker.register(create_test_detection(bbox=(0, 0, 0, 0)), datetime.utcnow())
+
+        for i in range(1, HISTORY_SIZE + 5):
+            obj.append_history((float(i), float(i)))
+
+        assert len(obj.history) == HISTORY_SIZE
+        assert tuple(obj.history[0]) == (5.0, 5.0)
+        assert tuple(obj.history[-1]) == (HISTORY_SIZE + 4.0, HISTORY_SIZE + 4.0)
+
+    def test_history_is_a_copy(self, tracker):
+        """Test mutating returned history does not affect the tracked object"""
+        obj = tracker.register(create_test_detection(), datetime.utcnow())
+
+        history = obj.history
+        history[0] = (0.0, 0.0)
+
+        assert tuple(obj.history[0]) == (150.0, 150.0)
+
+    def test_tracked_object_equality(self, tracker):
+        """Test tracked objects compare without touching the history buffer"""
+        timestamp = datetime.utcnow()
+        obj = tracker.register(create_test_detection(), timestamp)
+        other = TrackedObject(
+            object_id=obj.object_id,
+            class_name=obj.class_name,
+            centroid=obj.centroid,
+            bbox=obj.bbox,
+            confidence=obj.confidence,
+            first_seen=timestamp,
+            last_seen=timestamp,
+            history_head=obj.history_head,
+            history_count=obj.history_count,
+        )
+
+        assert obj == other
+
     def test_cooldown_management(self, tracker):
         """Test cooldown management"""
         plate_text = "ABC123"
@@ -157,6 +226,17 @@ class TestCentroidTracker:
         tracker.cleanup_cooldown()
         assert tracker.is_in_cooldown(plate_text)
 
+    def test_cooldown_expiry(self):
+        """Test expired cooldown entries are removed in expiry order"""
+        tracker = CentroidTracker(TrackingConfig(cooldown_seconds=0))
+
+        tracker.add_to_cooldown("ABC123")
+        tracker.add_to_cooldown("XYZ789")
+
+        tracker.cleanup_cooldown()
+        assert len(tracker.cooldown) == 0
+        assert not tracker.is_in_cooldown("ABC123")
+
     def test_set_plate_text(self, tracker):
         """Test setting plate text for tracked object"""
         detection = DetectionResult(
@@ -232,7 +312,7 @@ class TestDetector:
     def test_extract_plate_image(self):
         """Test extracting plate region from frame"""
         # Create a dummy frame
-        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        frame = _ZERO_FRAME
 
         # Create a mock detector (without actual model loading)
         detection = DetectionResult(
@@ -249,26 +329,81 @@ class TestDetector:
         assert plate_img.shape == (50, 100, 3)
 
 
+class TestONNXProviders:
+    """Test ONNX Runtime execution provider selection"""
+
+    @pytest.fixture
+    def ort(self, monkeypatch):
+        """Stub onnxruntime with a mocked InferenceSession"""
+        ort = MagicMock()
+        monkeypatch.setitem(sys.modules, "onnxruntime", ort)
+        return ort
+
+    @staticmethod
+    def load_providers(ort, **hardware):
+        """Load an ONNX detector and return the providers it requested"""
+        detector = ONNXDetector(
+            DetectionModelConfig(weights_path="/tmp/model.onnx", framework="onnx"),
+            HardwareAccelerationConfig(**hardware),
+        )
+        detector.load_model()
+        return ort.InferenceSession.call_args.kwargs["providers"]
+
+    def test_cpu_only(self, ort):
+        """Test CPU inference uses only the CPU provider"""
+        assert self.load_providers(ort, type="cpu") == ["CPUExecutionProvider"]
+
+    def test_tensorrt_without_cache(self, ort):
+        """Test TensorRT is tried first, falling back to CUDA and CPU"""
+        providers = self.load_providers(
+            ort, type="gpu", use_cuda=True, use_tensorrt=True, cuda_device=1
+        )
+
+        assert providers == [
+            ("TensorrtExecutionProvider", {"device_id": 1, "trt_fp16_enable": True}),
+            ("CUDAExecutionProvider", {"device_id": 1}),
+            "CPUExecutionProvider",
+        ]
+
+    def test_tensorrt_with_cache(self, ort):
+        """Test a cache directory enables the TensorRT engine cache"""
+        providers = self.load_providers(
+            ort, type="gpu", use_cuda=True, use_tensorrt=True,
+            tensorrt_fp16=False, tensorrt_cache_dir="/var/cache/trt"
+        )
+
+        assert providers[0] == ("TensorrtExecutionProvider", {
+            "device_id": 0,
+            "trt_fp16_enable": False,
+            "trt_engine_cache_enable": True,
+            "trt_engine_cache_path": "/var/cache/trt",
+        })
+        assert providers[1:] == [
+            ("CUDAExecutionProvider", {"device_id": 0}),
+            "CPUExecutionProvider",
+        ]
+
+
 class TestImagePreprocessing:
     """Test image preprocessing utilities"""
 
     def test_image_resize(self):
         """Test image resizing"""
-        img = np.zeros((480, 640, 3), dtype=np.uint8)
+        img = _ZERO_FRAME
         resized = cv2.resize(img, (320, 240))
 
         assert resized.shape == (240, 320, 3)
 
     def test_color_conversion(self):
         """Test BGR to RGB conversion"""
-        bgr = np.zeros((100, 100, 3), dtype=np.uint8)
+        bgr = _SMALL_ZERO_FRAME
         rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
 
         assert rgb.shape == bgr.shape
 
     def test_grayscale_conversion(self):
         """Test grayscale conversion"""
-        bgr = np.zeros((100, 100, 3), dtype=np.uint8)
+        bgr = _SMALL_ZERO_FRAME
         gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
 
         assert gray.shape == (100, 100)
@@ -276,10 +411,14 @@ class TestImagePreprocessing:
 
 
 # Integration test helpers
+@lru_cache(maxsize=None)
 def create_test_frame(width=640, height=480):
     """
     Create a test frame for testing
 
+    Frames are cached per size and shared between callers, so they are
+    read-only; use .copy() before mutating.
+
     Args:
         width: Frame width
         height: Frame height
@@ -288,6 +427,7 @@ def create_test_frame(width=640, height=480):
         Test frame (numpy array)
     """
     frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    frame.setflags(write=False)
     return frame
 
 
@@ -0,0 +1,107 @@
+"""
+Pipeline Tests
+Tests for GStreamer pipeline helpers with a stubbed GStreamer binding
+"""
+
+import sys
+import types
+import importlib
+import pytest
+from unittest.mock import MagicMock
+
+SECOND = 1_000_000_000
+CLOCK_TIME_NONE = 2**64 - 1
+
+# Wall-clock base time of the pipeline (2023-11-14 22:13:20 UTC)
+BASE_TIME = 1_700_000_000 * SECOND
+
+
+@pytest.fixture
+def gst(monkeypatch):
+    """Stub gi.repository.Gst in sys.modules"""
+    gst = MagicMock()
+    gst.SECOND = SECOND
+    gst.CLOCK_TIME_NONE = CLOCK_TIME_NONE
+
+    gi = types.ModuleType("gi")
+    gi.require_version = lambda *args: None
+    repository = types.ModuleType("gi.repository")
+    repository.Gst = gst
+    gi.repository = repository
+
+    monkeypatch.setitem(sys.modules, "gi", gi)
+    monkeypatch.setitem(sys.modules, "gi.repository", repository)
+    monkeypatch.delitem(sys.modules, "edge.gstreamer.pipeline", raising=False)
+    return gst
+
+
+@pytest.fixture
+def pipeline(gst):
+    """Create a pipeline with a fake GStreamer pipeline at BASE_TIME"""
+    module = importlib.import_module("edge.gstreamer.pipeline")
+    pipeline = module.ANPRPipeline(
+        camera_id=1,
+        rtsp_url="rtsp://camera",
+        detection_model_path="detection.hef",
+        ocr_model_path="ocr.hef",
+    )
+    pipeline.pipeline = MagicMock()
+    pipeline.pipeline.get_base_time.return_value = BASE_TIME
+    return pipeline
+
+
+def create_buffer(pts):
+    """Create a fake buffer with the given PTS"""
+    buf = MagicMock()
+    buf.pts = pts
+    return buf
+
+
+class TestFrameTimestamp:
+    """Test mapping buffer PTS to epoch time"""
+
+    def test_base_time_plus_pts(self, pipeline):
+        """Test timestamp is pipeline base time plus PTS in seconds"""
+        buf = create_buffer(2 * SECOND + SECOND // 2)
+
+        assert pipeline._frame_timestamp(buf) == pytest.approx(1_700_000_002.5)
+
+    def test_follows_wall_clock_jump(self, pipeline):
+        """Test timestamps follow the realtime clock after it is corrected"""
+        before = pipeline._frame_timestamp(create_buffer(10 * SECOND))
+
+        # NTP moves the realtime clock an hour ahead; live PTS follow it
+        after = pipeline._frame_timestamp(create_buffer((3600 + 11) * SECOND))
+
+        assert after - before == pytest.approx(3601)
+
+    def test_missing_pts_uses_current_time(self, pipeline, monkeypatch):
+        """Test buffers without PTS are stamped with the current time"""
+        monkeypatch.setattr("edge.gstreamer.pipeline.time.time", lambda: 123.0)
+
+        assert pipeline._frame_timestamp(create_buffer(CLOCK_TIME_NONE)) == 123.0
+
+
+class TestPipelineClock:
+    """Test the pipeline clock setup"""
+
+    def test_start_uses_realtime_clock(self, gst):
+        """Test the pipeline is given a realtime system clock"""
+        module = importlib.import_module("edge.gstreamer.pipeline")
+        pipeline = module.ANPRPipeline(
+            camera_id=1,
+            rtsp_url="rtsp://camera",
+            detection_model_path="detection.hef",
+            ocr_model_path="ocr.hef",
+        )
+
+        assert pipeline.start()
+
+        gst.SystemClock.assert_called_once_with(clock_type=gst.ClockType.REALTIME)
+        gst.parse_launch.return_value.use_clock.assert_called_once_with(
+            gst.SystemClock.return_value
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,303 @@
+"""
+Worker Service Tests
+Tests for the detection handoff and event batching of the edge worker service,
+with GStreamer stubbed out and a fake backend client
+"""
+
+import sys
+import types
+import signal
+import asyncio
+import logging
+import importlib
+import pytest
+import numpy as np
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+
+class FakeBackendClient:
+    """Fake backend client recording batches; optionally defers them"""
+
+    def __init__(self):
+        self.batches = []
+        self.defer = False
+        self.circuit_open_for = 0.0
+
+    async def batch_ingest_events(self, events):
+        self.batches.append(list(events))
+        if self.defer:
+            return 0, list(events)
+        return len(events), []
+
+
+@pytest.fixture
+def service_module(monkeypatch):
+    """Import the service module with gi and the GStreamer pipeline stubbed"""
+    gi = types.ModuleType("gi")
+    repository = types.ModuleType("gi.repository")
+    repository.GLib = MagicMock()
+    gi.repository = repository
+    pipeline = types.ModuleType("gstreamer.pipeline")
+    pipeline.ANPRPipeline = MagicMock()
+
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.setitem(sys.modules, "gi", gi)
+    monkeypatch.setitem(sys.modules, "gi.repository", repository)
+    monkeypatch.setitem(sys.modules, "gstreamer.pipeline", pipeline)
+    monkeypatch.delitem(sys.modules, "edge.worker.service", raising=False)
+    return importlib.import_module("edge.worker.service")
+
+
+@pytest.fixture
+def service(service_module, monkeypatch):
+    """Create a service with a small buffer and a fake backend client"""
+    monkeypatch.setattr(signal, "signal", lambda *args: None)
+    config = service_module.WorkerConfig(
+        event_buffer_size=4,
+        event_batch_max=2,
+        event_batch_timeout=0.0
+    )
+    service = service_module.EdgeWorkerService(config)
+    service.backend_client = FakeBackendClient()
+    service.loop = MagicMock()
+    return service
+
+
+def create_metadata(plate_text="ABC123", **extra):
+    """
+    Create detection metadata as produced by the Hailo post-processing
+
+    Args:
+        plate_text: Plate text
+        **extra: Extra metadata fields
+
+    Returns:
+        Metadata dictionary
+    """
+    metadata = {
+        "plate_text": plate_text,
+        "detection_confidence": 0.8,
+        "ocr_confidence": 0.6,
+    }
+    metadata.update(extra)
+    return metadata
+
+
+def create_events(service_module, count):
+    """Create plate events PLATE0..PLATE<count-1>"""
+    return [
+        service_module.PlateEvent(
+            camera_id=1,
+            plate_text=f"PLATE{i}",
+            confidence=0.9,
+            timestamp=datetime.now(timezone.utc),
+        )
+        for i in range(count)
+    ]
+
+
+def plate_texts(events):
+    """Get plate texts of events"""
+    return [event.plate_text for event in events]
+
+
+class TestOnPlateDetected:
+    """Test building plate events from detection metadata"""
+
+    def test_creates_event(self, service):
+        """Test an event is buffered with averaged confidence and frame time"""
+        service._on_plate_detected(1, create_metadata(), 1_700_000_000.5)
+
+        [event] = service.event_buffer
+        assert event.camera_id == 1
+        assert event.plate_text == "ABC123"
+        assert event.confidence == pytest.approx(0.7)
+        assert event.timestamp == datetime.fromtimestamp(1_700_000_000.5, tz=timezone.utc)
+        assert event.bbox is None
+        assert event.metadata is None
+
+    def test_numpy_confidences_become_floats(self, service):
+        """Test numpy confidences are stored as plain floats"""
+        metadata = create_metadata(
+            detection_confidence=np.float32(0.5),
+            ocr_confidence=np.float64(0.25)
+        )
+        service._on_plate_detected(1, metadata, 0.0)
+
+        [event] = service.event_buffer
+        assert type(event.detection_confidence) is float
+        assert type(event.ocr_confidence) is float
+        assert type(event.confidence) is float
+
+    def test_incomplete_metadata_is_skipped(self, service):
+        """Test metadata missing plate fields is skipped"""
+        metadata = create_metadata()
+        del metadata["ocr_confidence"]
+        service._on_plate_detected(1, metadata, 0.0)
+
+        assert not service.event_buffer
+
+    def test_only_allowlisted_metadata_is_forwarded(self, service, service_module):
+        """Test only allowlisted scalar metadata is forwarded"""
+        metadata = create_metadata(
+            hailo_stream_id=3,
+            frame_pts=1234,
+            inference_ms=[1.5],
+            raw_tensor=np.zeros(4),
+        )
+        service._on_plate_detected(1, metadata, 0.0)
+
+        [event] = service.event_buffer
+        assert event.metadata == {"hailo_stream_id": 3, "frame_pts": 1234}
+        assert set(event.metadata) <= set(service_module.METADATA_KEYS)
+
+    @pytest.mark.parametrize("bbox", [
+        {"x": 0, "y": 0, "width": 0, "height": 0},
+        {"x": 10, "y": 20},
+        {},
+    ])
+    def test_empty_or_incomplete_bbox_is_skipped(self, service, bbox):
+        """Test all-zero and incomplete boxes are not attached"""
+        service._on_plate_detected(1, create_metadata(bbox=bbox), 0.0)
+
+        [event] = service.event_buffer
+        assert event.bbox is None
+
+    def test_bbox_is_attached(self, service):
+        """Test a valid box is attached to the event"""
+        bbox = {"x": 10, "y": 20, "width": 100, "height": 40}
+        service._on_plate_detected(1, create_metadata(bbox=bbox), 0.0)
+
+        [event] = service.event_buffer
+        assert (event.bbox.x, event.bbox.y, event.bbox.width, event.bbox.height) == (
+            10, 20, 100, 40
+        )
+
+
+class TestEventHandoff:
+    """Test the cross-thread event buffer"""
+
+    def test_wakes_only_when_buffer_becomes_non_empty(self, service):
+        """Test the processor is woken once per empty to non-empty transition"""
+        for _ in range(3):
+            service._on_plate_detected(1, create_metadata(), 0.0)
+        assert service.loop.call_soon_threadsafe.call_count == 1
+
+        service._take_events()
+        service._on_plate_detected(1, create_metadata(), 0.0)
+        assert service.loop.call_soon_threadsafe.call_count == 2
+
+    def test_full_buffer_drops_new_events(self, service):
+        """Test events beyond event_buffer_size are dropped"""
+        for i in range(6):
+            service._on_plate_detected(1, create_metadata(f"PLATE{i}"), 0.0)
+
+        assert plate_texts(service.event_buffer) == [
+            "PLATE0", "PLATE1", "PLATE2", "PLATE3"
+        ]
+        assert service.dropped_events == 2
+
+    def test_drop_warnings_are_rate_limited(self, service, service_module, caplog):
+        """Test only every Nth dropped event is logged"""
+        drops = service_module.DROP_LOG_INTERVAL + 1
+        with caplog.at_level(logging.WARNING):
+            for _ in range(service.config.event_buffer_size + drops):
+                service._on_plate_detected(1, create_metadata(), 0.0)
+
+        warnings = [r for r in caplog.records if "Event buffer full" in r.message]
+        assert len(warnings) == 2
+        assert service.dropped_events == drops
+
+    def test_take_events_swaps_buffer(self, service):
+        """Test taking events swaps in a fresh buffer"""
+        service._on_plate_detected(1, create_metadata(), 0.0)
+        buffer = service.event_buffer
+
+        events = service._take_events()
+
+        assert events is buffer
+        assert len(events) == 1
+        assert not service.event_buffer
+        assert service.event_buffer is not buffer
+
+
+class TestSendEvents:
+    """Test sending buffered events to the backend"""
+
+    @pytest.mark.asyncio
+    async def test_chunks_by_batch_max(self, service, service_module):
+        """Test events are sent in batches of at most event_batch_max"""
+        events = create_events(service_module, 5)
+
+        assert await service._send_events(events)
+        assert [plate_texts(b) for b in service.backend_client.batches] == [
+            ["PLATE0", "PLATE1"], ["PLATE2", "PLATE3"], ["PLATE4"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_deferred_events_are_requeued(self, service, service_module):
+        """Test events deferred by the open breaker go back to the buffer front"""
+        service.backend_client.defer = True
+        events = create_events(service_module, 3)
+        service.event_buffer.extend(create_events(service_module, 1))
+        service.event_buffer[0].plate_text = "NEWER"
+
+        assert not await service._send_events(events)
+        assert len(service.backend_client.batches) == 1
+        assert plate_texts(service.event_buffer) == [
+            "PLATE0", "PLATE1", "PLATE2", "NEWER"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_requeue_overflow_drops_oldest(self, service, service_module):
+        """Test requeued events beyond the buffer size drop the oldest"""
+        service.backend_client.defer = True
+        events = create_events(service_module, 6)
+
+        assert not await service._send_events(events)
+        assert plate_texts(service.event_buffer) == [
+            "PLATE2", "PLATE3", "PLATE4", "PLATE5"
+        ]
+        assert service.dropped_events == 2
+
+
+class TestEventProcessor:
+    """Test the event processor task"""
+
+    @pytest.mark.asyncio
+    async def test_sends_detected_events(self, service):
+        """Test detections are sent once the processor is woken"""
+        service.loop = asyncio.get_running_loop()
+        task = asyncio.create_task(service._event_processor())
+
+        for i in range(3):
+            service._on_plate_detected(1, create_metadata(f"PLATE{i}"), 0.0)
+        for _ in range(100):
+            if sum(map(len, service.backend_client.batches)) == 3:
+                break
+            await asyncio.sleep(0.01)
+
+        service.stop_event.set()
+        await asyncio.wait_for(task, timeout=1.0)
+
+        sent = [event for batch in service.backend_client.batches for event in batch]
+        assert plate_texts(sent) == ["PLATE0", "PLATE1", "PLATE2"]
+        assert all(len(batch) <= 2 for batch in service.backend_client.batches)
+
+    @pytest.mark.asyncio
+    async def test_flushes_buffer_on_shutdown(self, service, service_module):
+        """Test events still buffered at shutdown are sent before exiting"""
+        service.event_buffer.extend(create_events(service_module, 3))
+        service.stop_event.set()
+
+        await asyncio.wait_for(service._event_processor(), timeout=1.0)
+
+        assert [plate_texts(b) for b in service.backend_client.batches] == [
+            ["PLATE0", "PLATE1"], ["PLATE2"]
+        ]
+        assert not service.event_buffer
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -4,29 +4,141 @@ Handles HTTP requests to FastAPI backend and retry logic.
 """
 
 import httpx
+import orjson
+import msgspec
 import logging
-from typing import List, Optional
+import time
+from typing import Any, List, Optional, Tuple
 from datetime import datetime
-import asyncio
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 from .models import PlateEvent, CameraConfig
 
 logger = logging.getLogger(__name__)
 
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# Batch responses that mean the backend cannot take this batch as a whole
+# (endpoint missing or one invalid event); events are then sent one by one
+_BATCH_FALLBACK_STATUSES = (404, 405, 422)
+
+
+class CircuitOpenError(Exception):
+    """Raised when requests are short-circuited by the open circuit breaker"""
+
+
+class PartialIngestError(Exception):
+    """Raised when the backend rejected some events of a batch with retryable errors"""
+
+
+def _plate_default(obj: Any) -> Any:
+    """Convert values orjson rejects: numpy scalars and float subclasses"""
+    if hasattr(obj, "item"):
+        return obj.item()
+    if isinstance(obj, float):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize events to JSON bytes (dataclasses and datetimes are native to orjson)"""
+    return orjson.dumps(obj, default=_plate_default, option=orjson.OPT_UTC_Z)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry transport errors, server errors, rate limiting and partial batches"""
+    if isinstance(exc, (httpx.TransportError, PartialIngestError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status >= 500 or status == 429
+    return False
+
+
+def _log_retry(retry_state: RetryCallState):
+    """Log a failed attempt before backing off"""
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(exc, httpx.HTTPStatusError):
+        reason = f"HTTP {exc.response.status_code}"
+    else:
+        reason = str(exc)
+    logger.warning(
+        f"Backend request failed (attempt {retry_state.attempt_number}): {reason}"
+    )
+
 
 class BackendClient:
     """Client for communicating with the ANPR backend API"""
 
-    def __init__(self, backend_url: str, timeout: float = 10.0):
+    def __init__(
+        self,
+        backend_url: str,
+        timeout: float = 10.0,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        uds: Optional[str] = None,
+        retry_wait_initial: float = 1.0,
+        retry_wait_max: float = 5.0
+    ):
         """
         Initialize backend client.
 
         Args:
             backend_url: Base URL of the backend API
             timeout: Request timeout in seconds
+            failure_threshold: Consecutive failed requests before the
+                circuit breaker opens
+            recovery_timeout: Seconds the circuit stays open before
+                requests are attempted again
+            uds: Optional Unix domain socket path of a local reverse proxy;
+                when set, all requests are sent through it and backend_url
+                only supplies the Host header and paths
+            retry_wait_initial: Initial retry backoff in seconds
+            retry_wait_max: Maximum retry backoff in seconds
         """
         self.backend_url = backend_url.rstrip('/')
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=self.timeout)
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.retry_wait_initial = retry_wait_initial
+        self.retry_wait_max = retry_wait_max
+        self._cb_failures = 0
+        self._cb_open_until = 0.0
+
+        # Endpoint URLs, parsed once
+        self._url_health = httpx.URL(f"{self.backend_url}/healthz")
+        self._url_cameras = httpx.URL(f"{self.backend_url}/api/cameras")
+        self._url_ingest = httpx.URL(f"{self.backend_url}/api/plate-events/ingest")
+        self._url_ingest_batch = httpx.URL(f"{self.backend_url}/api/plate-events/ingest-batch")
+        limits = httpx.Limits(
+            max_keepalive_connections=32,
+            max_connections=64,
+            keepalive_expiry=60
+        )
+        timeout_config = httpx.Timeout(self.timeout, connect=2.0)
+        if uds:
+            # An explicit transport disables environment proxies, so only
+            # build one when routing through the local socket
+            self.client = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(http2=True, uds=uds, limits=limits),
+                timeout=timeout_config
+            )
+        else:
+            self.client = httpx.AsyncClient(
+                http2=True,
+                limits=limits,
+                timeout=timeout_config
+            )
+
+    @property
+    def circuit_open_for(self) -> float:
+        """Seconds until the open circuit breaker lets requests through (0 if closed)"""
+        return max(0.0, self._cb_open_until - time.monotonic())
 
     async def close(self):
         """Close the HTTP client"""
@@ -40,7 +152,7 @@ class BackendClient:
             True if healthy, False otherwise
         """
         try:
-            response = await self.client.get(f"{self.backend_url}/healthz")
+            response = await self.client.get(self._url_health)
             return response.status_code == 200
         except Exception as e:
             logger.warning(f"Health check failed: {e}")
@@ -54,11 +166,10 @@ class BackendClient:
             List of camera configurations
         """
         try:
-            response = await self.client.get(f"{self.backend_url}/api/cameras")
+            response = await self.client.get(self._url_cameras)
             response.raise_for_status()
 
-            cameras_data = response.json()
-            cameras = [CameraConfig(**cam) for cam in cameras_data]
+            cameras = msgspec.json.decode(response.content, type=List[CameraConfig])
 
             # Filter only enabled cameras
             return [cam for cam in cameras if cam.enabled]
@@ -67,6 +178,48 @@ class BackendClient:
             logger.error(f"Failed to fetch cameras: {e}")
             return []
 
+    def _retrying(self, max_retries: int) -> AsyncRetrying:
+        """Retry policy: exponential backoff with jitter on retryable errors"""
+        return AsyncRetrying(
+            stop=stop_after_attempt(max_retries),
+            wait=wait_exponential_jitter(
+                initial=self.retry_wait_initial,
+                max=self.retry_wait_max,
+                jitter=self.retry_wait_initial
+            ),
+            retry=retry_if_exception(_is_retryable),
+            before_sleep=_log_retry,
+            reraise=True
+        )
+
+    async def _post(self, url: httpx.URL, content: bytes) -> httpx.Response:
+        """
+        POST JSON content through the circuit breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            httpx.HTTPError: If the request fails
+        """
+        if time.monotonic() < self._cb_open_until:
+            raise CircuitOpenError("Backend circuit breaker is open")
+
+        try:
+            response = await self.client.post(url, content=content, headers=_JSON_HEADERS)
+            response.raise_for_status()
+        except Exception as e:
+            if _is_retryable(e):
+                self._cb_failures += 1
+                if self._cb_failures >= self.failure_threshold:
+                    self._cb_open_until = time.monotonic() + self.recovery_timeout
+                    logger.error(
+                        f"Backend failed {self._cb_failures} consecutive requests, "
+                        f"pausing sends for {self.recovery_timeout:.0f}s"
+                    )
+            raise
+
+        self._cb_failures = 0
+        return response
+
     async def ingest_plate_event(
         self,
         event: PlateEvent,
@@ -82,76 +235,176 @@ class BackendClient:
         Returns:
             True if successful, False otherwise
         """
-        retry_delays = [1, 2, 5]  # Exponential backoff (seconds)
+        try:
+            content = _dumps(event)
 
-        for attempt in range(max_retries):
-            try:
-                # Convert event to JSON-serializable dict
-                event_data = event.model_dump(mode='json')
+            async for attempt in self._retrying(max_retries):
+                with attempt:
+                    await self._post(
+                        self._url_ingest,
+                        content
+                    )
 
-                response = await self.client.post(
-                    f"{self.backend_url}/api/plate-events/ingest",
-                    json=event_data
-                )
-                response.raise_for_status()
+        except CircuitOpenError:
+            logger.warning(f"Backend unavailable, plate event not sent: {event.plate_text}")
+            return False
 
-                logger.info(
-                    f"Plate event ingested: {event.plate_text} "
-                    f"(camera {event.camera_id}, conf: {event.confidence:.2f})"
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                logger.error(
+                    f"Camera {event.camera_id} not found in backend. "
+                    "Skipping event."
+                )
+            else:
+                logger.error(
+                    f"Failed to ingest plate event {event.plate_text}: "
+                    f"HTTP {e.response.status_code}"
                 )
-                return True
+            return False
 
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    logger.error(
-                        f"Camera {event.camera_id} not found in backend. "
-                        "Skipping event."
-                    )
-                    return False
-                else:
-                    logger.warning(
-                        f"HTTP error ingesting event (attempt {attempt + 1}/{max_retries}): "
-                        f"{e.response.status_code}"
-                    )
+        except Exception as e:
+            logger.error(f"Failed to ingest plate event {event.plate_text}: {e}")
+            return False
+
+        logger.info(
+            f"Plate event ingested: {event.plate_text} "
+            f"(camera {event.camera_id}, conf: {event.confidence:.2f})"
+        )
+        return True
+
+    async def _ingest_individually(
+        self,
+        events: List[PlateEvent],
+        max_retries: int
+    ) -> Tuple[int, List[PlateEvent]]:
+        """
+        Send events one by one, stopping if the circuit breaker opens.
 
-            except Exception as e:
+        Returns:
+            Tuple of (number of successfully ingested events, events deferred
+            by the open circuit breaker)
+        """
+        success_count = 0
+        for i, event in enumerate(events):
+            if await self.ingest_plate_event(event, max_retries):
+                success_count += 1
+            elif self.circuit_open_for:
+                # Backend went away mid-fallback; keep the rest
+                return success_count, events[i:]
+        # Individual ingest logs its own failures
+        return success_count, []
+
+    async def bulk_ingest(
+        self,
+        events: List[PlateEvent],
+        max_retries: int = 3
+    ) -> Tuple[int, List[PlateEvent]]:
+        """
+        Send multiple plate events to backend in a single request.
+
+        The whole batch is retried with backoff on transport or server
+        errors. When the backend reports per-event errors, only the failed
+        events are retried; events rejected with 404 (unknown camera) are
+        dropped. If the backend rejects the batch itself (no batch endpoint,
+        or a validation error), the events are sent individually instead.
+        Events not sent because the circuit breaker is open are returned so
+        the caller can keep them until the backend recovers.
+
+        Args:
+            events: List of plate events to send
+            max_retries: Maximum number of retry attempts
+
+        Returns:
+            Tuple of (number of successfully ingested events, events deferred
+            by the open circuit breaker)
+        """
+        pending = list(events)
+        deferred: List[PlateEvent] = []
+        success_count = 0
+
+        try:
+            content = _dumps(pending)
+        except orjson.JSONEncodeError as e:
+            # Send one by one so only the offending event is lost
+            logger.warning(
+                f"Could not serialize batch ({e}), sending "
+                f"{len(pending)} events individually"
+            )
+            return await self._ingest_individually(pending, max_retries)
+
+        try:
+            async for attempt in self._retrying(max_retries):
+                with attempt:
+                    response = await self._post(self._url_ingest_batch, content)
+
+                    result = response.json()
+                    success_count += result.get("ingested", 0)
+
+                    retry_events = []
+                    for error in result.get("errors", []):
+                        event = pending[error["index"]]
+                        if error.get("status_code") == 404:
+                            logger.error(
+                                f"Camera {event.camera_id} not found in backend. "
+                                "Skipping event."
+                            )
+                        else:
+                            retry_events.append(event)
+
+                    pending = retry_events
+                    if pending:
+                        content = _dumps(pending)
+                        raise PartialIngestError(f"{len(pending)} events failed")
+
+        except CircuitOpenError:
+            logger.warning(
+                f"Backend unavailable, deferring {len(pending)} plate events"
+            )
+            deferred = pending
+            pending = []
+
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status in _BATCH_FALLBACK_STATUSES:
                 logger.warning(
-                    f"Failed to ingest event (attempt {attempt + 1}/{max_retries}): {e}"
+                    f"Batch ingest rejected (HTTP {status}), sending "
+                    f"{len(pending)} events individually"
                 )
+                count, deferred = await self._ingest_individually(pending, max_retries)
+                success_count += count
+                pending = []
+            else:
+                logger.error(f"Failed to ingest batch: HTTP {status}")
 
-            # Wait before retry
-            if attempt < max_retries - 1:
-                delay = retry_delays[min(attempt, len(retry_delays) - 1)]
-                await asyncio.sleep(delay)
+        except Exception as e:
+            logger.error(f"Failed to ingest batch: {e}")
 
-        logger.error(
-            f"Failed to ingest plate event after {max_retries} attempts: "
-            f"{event.plate_text}"
-        )
-        return False
+        if pending:
+            logger.error(f"Failed to ingest {len(pending)} plate events")
+
+        return success_count, deferred
 
     async def batch_ingest_events(
         self,
         events: List[PlateEvent]
-    ) -> int:
+    ) -> Tuple[int, List[PlateEvent]]:
         """
-        Ingest multiple plate events concurrently.
+        Ingest multiple plate events with a single bulk request.
 
         Args:
             events: List of plate events to send
 
         Returns:
-            Number of successfully ingested events
+            Tuple of (number of successfully ingested events, events deferred
+            by the open circuit breaker)
         """
         if not events:
-            return 0
-
-        tasks = [self.ingest_plate_event(event) for event in events]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+            return 0, []
 
-        success_count = sum(1 for r in results if r is True)
+        success_count, deferred = await self.bulk_ingest(events)
         logger.info(
-            f"Batch ingest: {success_count}/{len(events)} events successful"
+            f"Batch ingest: {success_count}/{len(events)} events successful, "
+            f"{len(deferred)} deferred"
         )
 
-        return success_count
+        return success_count, deferred
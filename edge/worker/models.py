@@ -2,12 +2,15 @@
 Data models for edge worker.
 """
 
+import msgspec
 from pydantic import BaseModel, Field
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, Dict, Any
 
 
-class BoundingBox(BaseModel):
+@dataclass(slots=True)
+class BoundingBox:
     """Bounding box for detected plate"""
     x: int
     y: int
@@ -15,25 +18,33 @@ class BoundingBox(BaseModel):
     height: int
 
 
-class PlateEvent(BaseModel):
+@dataclass(slots=True)
+class PlateEvent:
     """
     Plate detection event sent from edge to backend.
 
-    This matches the backend's PlateEventCreate schema.
+    This matches the backend's PlateEventCreate schema. Events are built
+    from trusted in-process data, so they are plain dataclasses without
+    validation; the backend validates on ingest.
     """
     camera_id: int
     plate_text: str
     confidence: float
+    timestamp: datetime
     detection_confidence: Optional[float] = None
     ocr_confidence: Optional[float] = None
     bbox: Optional[BoundingBox] = None
-    timestamp: datetime
     image_path: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
 
-class CameraConfig(BaseModel):
-    """Camera configuration from backend"""
+class CameraConfig(msgspec.Struct, frozen=True):
+    """
+    Camera configuration from backend.
+
+    Decoded and validated directly from the response body with msgspec;
+    unknown fields such as created_at are ignored.
+    """
     id: int
     name: str
     rtsp_url: str
@@ -48,6 +59,7 @@ class CameraConfig(BaseModel):
 class WorkerConfig(BaseModel):
     """Edge worker configuration"""
     backend_url: str = Field(default="http://localhost:8000")
+    backend_uds: Optional[str] = Field(default=None)
     detection_model_path: str = Field(default="/opt/hailo/models/yolov8n-plate.hef")
     ocr_model_path: str = Field(default="/opt/hailo/models/plate-ocr.hef")
     target_width: int = Field(default=640)
@@ -57,4 +69,7 @@ class WorkerConfig(BaseModel):
     plate_images_dir: str = Field(default="/tmp/plates")
     max_cameras: int = Field(default=4)
     reconnect_interval: int = Field(default=30)
+    event_buffer_size: int = Field(default=1024)
+    event_batch_max: int = Field(default=64)
+    event_batch_timeout: float = Field(default=0.05)
     log_level: str = Field(default="INFO")
@@ -7,20 +7,32 @@ import asyncio
 import logging
 import signal
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Optional
 import threading
+from collections import deque
+from operator import itemgetter
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from gstreamer.pipeline import ANPRPipeline
+from gi.repository import GLib
 from worker.backend_client import BackendClient
 from worker.models import PlateEvent, CameraConfig, WorkerConfig, BoundingBox
 
 logger = logging.getLogger(__name__)
 
+# Scalar metadata fields forwarded to the backend with each plate event
+METADATA_KEYS = ("hailo_stream_id", "frame_pts", "inference_ms")
+
+# Log only every Nth event dropped on a full buffer to avoid a logging storm
+DROP_LOG_INTERVAL = 100
+
+_get_plate_fields = itemgetter('plate_text', 'detection_confidence', 'ocr_confidence')
+_get_bbox_fields = itemgetter('x', 'y', 'width', 'height')
+
 
 class EdgeWorkerService:
     """
@@ -42,11 +54,19 @@ class EdgeWorkerService:
             config: Worker configuration
         """
         self.config = config
-        self.backend_client = BackendClient(config.backend_url)
+        self.backend_client = BackendClient(config.backend_url, uds=config.backend_uds)
         self.pipelines: Dict[int, ANPRPipeline] = {}
-        self.pipeline_threads: Dict[int, threading.Thread] = {}
+        self.glib_loop: Optional[GLib.MainLoop] = None
+        self.glib_thread: Optional[threading.Thread] = None
         self.running = False
-        self.event_queue = asyncio.Queue()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stop_event = asyncio.Event()
+
+        # Events handed over from GStreamer threads; swapped out by the processor
+        self.event_buffer: deque = deque()
+        self.event_buffer_lock = threading.Lock()
+        self.events_ready = asyncio.Event()
+        self.dropped_events = 0
 
         # Setup logging
         logging.basicConfig(
@@ -62,35 +82,51 @@ class EdgeWorkerService:
         """Handle shutdown signals"""
         logger.info(f"Received signal {signum}, shutting down...")
         self.running = False
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.stop_event.set)
 
-    def _on_plate_detected(self, camera_id: int, metadata: dict):
+    def _on_plate_detected(self, camera_id: int, metadata: dict, frame_ts: float):
         """
         Callback for plate detection results from GStreamer pipeline.
 
         Args:
             camera_id: Camera ID
             metadata: Detection metadata from Hailo
+            frame_ts: Frame capture time in epoch seconds (from buffer PTS)
         """
         try:
             # Extract plate information from Hailo metadata
             # This structure depends on the post-processing plugin output
-            plate_text = metadata.get('plate_text', '')
-            detection_conf = metadata.get('detection_confidence', 0.0)
-            ocr_conf = metadata.get('ocr_confidence', 0.0)
-            bbox_data = metadata.get('bbox', {})
+            try:
+                plate_text, detection_conf, ocr_conf = _get_plate_fields(metadata)
+            except KeyError:
+                logger.debug(f"Incomplete plate metadata from camera {camera_id}, skipping")
+                return
+
+            # Hailo metadata may hold numpy scalars; keep plain floats
+            detection_conf = float(detection_conf)
+            ocr_conf = float(ocr_conf)
 
             # Calculate overall confidence (average of detection and OCR)
             confidence = (detection_conf + ocr_conf) / 2.0
 
-            # Create bounding box
+            # Create bounding box, skipping missing or all-zero boxes
             bbox = None
+            bbox_data = metadata.get('bbox')
             if bbox_data:
-                bbox = BoundingBox(
-                    x=bbox_data.get('x', 0),
-                    y=bbox_data.get('y', 0),
-                    width=bbox_data.get('width', 0),
-                    height=bbox_data.get('height', 0)
-                )
+                try:
+                    bbox_values = _get_bbox_fields(bbox_data)
+                except KeyError:
+                    bbox_values = None
+                if bbox_values and any(bbox_values):
+                    bbox = BoundingBox(*bbox_values)
+
+            # Forward only allowlisted scalar metadata, not the raw Hailo output
+            event_metadata = {
+                key: metadata[key]
+                for key in METADATA_KEYS
+                if isinstance(metadata.get(key), (int, float, str, bool))
+            }
 
             # Create plate event
             event = PlateEvent(
@@ -100,41 +136,149 @@ class EdgeWorkerService:
                 detection_confidence=detection_conf,
                 ocr_confidence=ocr_conf,
                 bbox=bbox,
-                timestamp=datetime.utcnow(),
-                metadata=metadata
+                timestamp=datetime.fromtimestamp(frame_ts, tz=timezone.utc),
+                metadata=event_metadata or None
             )
 
-            # Add to queue for async processing
-            asyncio.run_coroutine_threadsafe(
-                self.event_queue.put(event),
-                self.loop
+            # Hand over to the event loop; wake the processor only when the
+            # buffer goes from empty to non-empty
+            with self.event_buffer_lock:
+                full = len(self.event_buffer) >= self.config.event_buffer_size
+                if full:
+                    self.dropped_events += 1
+                    dropped = self.dropped_events
+                else:
+                    wake = not self.event_buffer
+                    self.event_buffer.append(event)
+
+            if full:
+                if (dropped - 1) % DROP_LOG_INTERVAL == 0:
+                    logger.warning(
+                        f"Event buffer full, dropping plate events "
+                        f"(camera {camera_id}, {dropped} dropped)"
+                    )
+                return
+
+            if wake:
+                self.loop.call_soon_threadsafe(self.events_ready.set)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Plate detected: {plate_text} "
+                    f"(camera {camera_id}, conf: {confidence:.2f})"
+                )
+
+        except Exception as e:
+            logger.error(f"Error processing plate detection: {e}")
+
+    def _take_events(self) -> deque:
+        """Atomically swap out the buffered events"""
+        with self.event_buffer_lock:
+            events = self.event_buffer
+            self.event_buffer = deque()
+        return events
+
+    def _requeue_events(self, events: list):
+        """
+        Put unsent events back at the front of the buffer, oldest first.
+
+        If the buffer overflows, the oldest events are dropped.
+        """
+        with self.event_buffer_lock:
+            self.event_buffer.extendleft(reversed(events))
+            overflow = len(self.event_buffer) - self.config.event_buffer_size
+            for _ in range(overflow):
+                self.event_buffer.popleft()
+            if overflow > 0:
+                self.dropped_events += overflow
+
+        if overflow > 0:
+            logger.warning(
+                f"Event buffer full, dropped {overflow} oldest plate events "
+                f"({self.dropped_events} dropped)"
             )
 
-            logger.debug(
-                f"Plate detected: {plate_text} "
-                f"(camera {camera_id}, conf: {confidence:.2f})"
+    async def _send_events(self, events: list) -> bool:
+        """
+        Send events to backend in batches of at most event_batch_max.
+
+        Returns:
+            False if the backend circuit breaker is open; the unsent events
+            are then put back in the buffer
+        """
+        batch_max = self.config.event_batch_max
+        for i in range(0, len(events), batch_max):
+            _, deferred = await self.backend_client.batch_ingest_events(
+                events[i:i + batch_max]
+            )
+            if deferred:
+                self._requeue_events(deferred + events[i + batch_max:])
+                return False
+        return True
+
+    async def _flush_events(self):
+        """Send all buffered events once more before shutdown"""
+        if not await self._send_events(list(self._take_events())):
+            logger.error(
+                f"Backend unavailable at shutdown, {len(self.event_buffer)} "
+                "plate events not sent"
             )
 
-        except Exception as e:
-            logger.error(f"Error processing plate detection: {e}")
+    async def _wait_for_stop(self, timeout: float) -> bool:
+        """
+        Wait until shutdown is requested or the timeout elapses.
+
+        Returns:
+            True if shutdown was requested
+        """
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
 
     async def _event_processor(self):
-        """Process plate events from queue and send to backend"""
-        while self.running:
-            try:
-                # Get event from queue with timeout
-                event = await asyncio.wait_for(
-                    self.event_queue.get(),
-                    timeout=1.0
+        """Process buffered plate events and send to backend in batches"""
+        stop_wait = asyncio.create_task(self.stop_event.wait())
+        ready_wait = None
+
+        try:
+            while True:
+                # Sleep until events arrive or shutdown is requested
+                ready_wait = asyncio.create_task(self.events_ready.wait())
+                await asyncio.wait(
+                    {ready_wait, stop_wait},
+                    return_when=asyncio.FIRST_COMPLETED
                 )
+                if stop_wait.done():
+                    break
 
-                # Send to backend
-                await self.backend_client.ingest_plate_event(event)
+                try:
+                    self.events_ready.clear()
 
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                logger.error(f"Error in event processor: {e}")
+                    # Give a burst a short window to fill the batch
+                    if len(self.event_buffer) < self.config.event_batch_max:
+                        await asyncio.sleep(self.config.event_batch_timeout)
+
+                    if not await self._send_events(list(self._take_events())):
+                        # Backend paused; retry once the circuit breaker recovers
+                        if await self._wait_for_stop(self.backend_client.circuit_open_for):
+                            break
+                        self.events_ready.set()
+
+                except Exception as e:
+                    logger.error(f"Error in event processor: {e}")
+
+            # Flush events buffered before shutdown
+            await self._flush_events()
+
+        except Exception as e:
+            logger.error(f"Error flushing events on shutdown: {e}")
+
+        finally:
+            stop_wait.cancel()
+            if ready_wait:
+                ready_wait.cancel()
 
     def _start_pipeline(self, camera: CameraConfig):
         """
@@ -162,13 +306,8 @@ class EdgeWorkerService:
             if pipeline.start():
                 self.pipelines[camera.id] = pipeline
 
-                # Run pipeline in separate thread
-                thread = threading.Thread(
-                    target=pipeline.run,
-                    daemon=True
-                )
-                thread.start()
-                self.pipeline_threads[camera.id] = thread
+                # Attach pipeline bus to the shared GLib main loop
+                pipeline.run()
 
                 logger.info(f"Pipeline started for camera {camera.id}")
             else:
@@ -187,12 +326,6 @@ class EdgeWorkerService:
         if camera_id in self.pipelines:
             logger.info(f"Stopping pipeline for camera {camera_id}")
             self.pipelines[camera_id].stop()
-
-            # Wait for thread to finish
-            if camera_id in self.pipeline_threads:
-                self.pipeline_threads[camera_id].join(timeout=5.0)
-                del self.pipeline_threads[camera_id]
-
             del self.pipelines[camera_id]
 
     async def _sync_cameras(self):
@@ -229,13 +362,19 @@ class EdgeWorkerService:
 
         logger.info("Edge worker service starting...")
 
+        # Single GLib main loop thread dispatching bus messages for all pipelines
+        self.glib_loop = GLib.MainLoop()
+        self.glib_thread = threading.Thread(target=self.glib_loop.run, daemon=True)
+        self.glib_thread.start()
+
         # Wait for backend to be available
         while self.running:
             if await self.backend_client.health_check():
                 logger.info("Backend is healthy")
                 break
             logger.warning("Waiting for backend to be available...")
-            await asyncio.sleep(5)
+            if await self._wait_for_stop(5):
+                break
 
         # Start event processor
         event_processor_task = asyncio.create_task(self._event_processor())
@@ -246,8 +385,9 @@ class EdgeWorkerService:
                 # Sync cameras
                 await self._sync_cameras()
 
-                # Wait before next sync
-                await asyncio.sleep(self.config.reconnect_interval)
+                # Wait before next sync, waking early on shutdown
+                if await self._wait_for_stop(self.config.reconnect_interval):
+                    break
 
         except Exception as e:
             logger.error(f"Error in main loop: {e}")
@@ -260,8 +400,18 @@ class EdgeWorkerService:
             for camera_id in list(self.pipelines.keys()):
                 self._stop_pipeline(camera_id)
 
-            # Cancel event processor
-            event_processor_task.cancel()
+            # Stop GLib main loop
+            self.glib_loop.quit()
+            self.glib_thread.join(timeout=5.0)
+
+            # Let the event processor flush buffered events, then send
+            # anything that arrived before the pipelines stopped
+            self.stop_event.set()
+            try:
+                await asyncio.wait_for(event_processor_task, timeout=10.0)
+                await self._flush_events()
+            except Exception as e:
+                logger.error(f"Error flushing events on shutdown: {e}")
 
             # Close backend client
             await self.backend_client.close()
@@ -284,4 +434,11 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Use uvloop where available (not supported on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     asyncio.run(main())